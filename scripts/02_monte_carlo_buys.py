@@ -26,7 +26,7 @@ from dataclasses import dataclass
 from typing import List
 
 
-@dataclass
+@dataclass(slots=True)
 class SimulationResult:
     """Result from a single Monte Carlo simulation."""
     total_op_bought: float
@@ -22,6 +22,7 @@ For each swap (fee calculation):
 6. Earn fees proportionally from that swap's trading fees
 """
 
+import math
 import sys
 from pathlib import Path
 
@@ -29,7 +30,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pandas as pd
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import List, Optional
 
 from uniswap import (
@@ -47,7 +48,7 @@ TICK_LOWER = 90000  # ~8,099 OP/ETH (90000 % 60 = 0 ✓)
 TICK_UPPER = 94980  # ~13,327 OP/ETH (94980 % 60 = 0 ✓)
 
 
-@dataclass
+@dataclass(slots=True)
 class LPPosition:
     """Tracks state of our LP position."""
     tick_lower: int
@@ -59,7 +60,7 @@ class LPPosition:
     total_fees_earned_op: float = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class DailyLPResult:
     """Result from a single day's LP activity."""
     date: str
@@ -119,6 +120,9 @@ def calculate_fees_from_swaps(
     - Calculate fees from that swap (fee_rate of input amount)
     - Sum our share of fees
 
+    All swaps for the day are evaluated at once as NumPy arrays instead of
+    iterating row by row; the in-range and sell-side checks become masks.
+
     Returns: (total_eth_fees, total_op_fees)
     """
     if our_liquidity <= 0:
@@ -132,44 +136,46 @@ def calculate_fees_from_swaps(
     price_lower = tick_to_price(tick_lower, decimal_adjustment=1, yx=True)
     price_upper = tick_to_price(tick_upper, decimal_adjustment=1, yx=True)
 
-    total_eth_fees = 0.0
-    total_op_fees = 0.0
+    # Price after each swap (same as sqrtpx96_to_price with decimal_adjustment=1)
+    sqrtpx96 = day_swaps["SQRTPRICEX96"].to_numpy(dtype=np.float64)
+    price = np.square(sqrtpx96 / 2 ** 96)
 
-    for _, swap in day_swaps.iterrows():
-        # Get price after this swap
-        sqrtpx96 = int(float(swap["SQRTPRICEX96"]))
-        price = sqrtpx96_to_price(sqrtpx96, invert=False, decimal_adjustment=1)
+    pool_liquidity = day_swaps["LIQUIDITY"].to_numpy(dtype=np.float64)
 
-        # Only earn fees if swap is in our range
-        if price < price_lower or price > price_upper:
-            continue
+    # Only earn fees if swap is in our range and the pool had liquidity
+    earning = (price >= price_lower) & (price <= price_upper) & (pool_liquidity > 0)
 
-        pool_liquidity = int(swap["LIQUIDITY"])
-        if pool_liquidity <= 0:
-            continue
+    # Our share of fees - we deepen the pool
+    our_share = np.where(earning, our_liquidity / (pool_liquidity + our_liquidity), 0.0)
 
-        # Our share of fees - we deepen the pool
-        total_liquidity = pool_liquidity + our_liquidity
-        our_share = our_liquidity / total_liquidity
+    # AMOUNT0_RAW = WETH change, AMOUNT1_RAW = OP change
+    # Positive = token flows INTO pool (user sells that token)
+    # Fee is paid on the token being sold
+    amount0 = day_swaps["AMOUNT0_RAW"].to_numpy(dtype=np.float64) / 1e18  # WETH (18 decimals)
+    amount1 = day_swaps["AMOUNT1_RAW"].to_numpy(dtype=np.float64) / 1e18  # OP (18 decimals)
 
-        # Calculate fees from this swap
-        # AMOUNT0_RAW = WETH change, AMOUNT1_RAW = OP change
-        # Positive = token flows INTO pool (user sells that token)
-        # Fee is paid on the token being sold
-        amount0 = float(swap["AMOUNT0_RAW"]) / 1e18  # WETH (18 decimals)
-        amount1 = float(swap["AMOUNT1_RAW"]) / 1e18  # OP (18 decimals)
+    total_eth_fees = float(np.dot(np.maximum(amount0, 0.0), our_share)) * fee_rate
+    total_op_fees = float(np.dot(np.maximum(amount1, 0.0), our_share)) * fee_rate
 
-        if amount0 > 0:
-            # User sold ETH, fee in ETH
-            swap_fee_eth = amount0 * fee_rate
-            total_eth_fees += swap_fee_eth * our_share
+    return total_eth_fees, total_op_fees
 
-        if amount1 > 0:
-            # User sold OP, fee in OP
-            swap_fee_op = amount1 * fee_rate
-            total_op_fees += swap_fee_op * our_share
 
-    return total_eth_fees, total_op_fees
+def calculate_matched_liquidity(
+    eth_deposited: float,
+    sqrtpx96: int,
+    tick_upper: int,
+) -> int:
+    """
+    Liquidity for an in-range deposit already matched to the range's token ratio.
+
+    When ETH and OP are in the exact ratio from match_tokens_to_range, both sides
+    imply the same liquidity, so it follows from the ETH side alone:
+    L = amount0 / (1/sqrt(P) - 1/sqrt(Pb)). This avoids get_liquidity's
+    tick -> price -> sqrtPriceX96 round trip for each boundary.
+    """
+    sqrt_p = sqrtpx96 / 2 ** 96
+    sqrt_pu = math.sqrt(tick_to_price(tick_upper, decimal_adjustment=1, yx=True))
+    return int(eth_deposited * 1e18 / (1 / sqrt_p - 1 / sqrt_pu))
 
 
 def calculate_deposit(
@@ -252,7 +258,11 @@ def calculate_deposit(
         op_deposited = eth_swap * price
         eth_deposited = eth_deposit
 
-    # Calculate liquidity from deposit
+        # Amounts are already matched to the range, so skip get_liquidity
+        liquidity = calculate_matched_liquidity(eth_deposited, sqrtpx96_int, tick_upper)
+        return eth_deposited, op_deposited, liquidity
+
+    # Calculate liquidity from single-sided deposit
     if eth_deposited > 0 or op_deposited > 0:
         liquidity = get_liquidity(
             x=eth_deposited,
@@ -444,7 +454,7 @@ def main():
         print(f"\nTotal OP Equivalent (position + fees): {total_op_equiv:,.2f}")
 
     # Save daily results
-    daily_df = pd.DataFrame([vars(r) for r in daily_results])
+    daily_df = pd.DataFrame([asdict(r) for r in daily_results])
     output_path = project_root / "data" / "lp_daily_results.csv"
     daily_df.to_csv(output_path, index=False)
     print(f"\nDaily results saved to: {output_path}")
@@ -4,23 +4,50 @@ Basic tests for Uniswap V3 calculation utilities.
 Tests are based on examples from the original R documentation.
 """
 
+import math
+import warnings
+
+import numpy as np
 import pandas as pd
 import pytest
 
 from uniswap import (
     tick_to_price,
+    tick_to_price_batch,
     get_closest_tick,
     sqrtpx96_to_price,
     price_to_sqrtpx96,
     get_liquidity,
+    get_liquidity_batch,
     get_position_balance,
     check_positions,
     swap_within_tick,
+    swap_across_ticks,
+    swap_across_ticks_batch,
     size_price_change_in_tick,
     calc_fees_from_trades,
+    calc_fees_from_trades_multi,
     find_recalculation_price,
+    find_recalculation_prices_batch,
     match_tokens_to_range,
+    match_tokens_to_range_batch,
+    make_range_matcher,
     price_all_tokens,
+    price_all_tokens_batch,
+    TickIndex,
+)
+from uniswap._sqrtpricemath import (
+    amount0_delta,
+    amount1_delta,
+    next_sqrt_price_from_amount0,
+    next_sqrt_price_from_amount1,
+)
+from uniswap._tickmath import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    get_sqrt_ratio_at_tick,
 )
 
 
@@ -44,6 +71,18 @@ class TestTickToPrice:
         assert abs(result_yx_false / result_yx_true - 1) < 0.000001
 
 
+class TestTickToPriceBatch:
+    """Tests for tick_to_price_batch function."""
+
+    def test_matches_scalar(self):
+        """Batch prices match tick_to_price in both orientations."""
+        ticks = [-50100, 0, 204232, 260220]
+        for decimal_adjustment, yx in [(1e10, True), (1e12, False)]:
+            result = tick_to_price_batch(ticks, decimal_adjustment=decimal_adjustment, yx=yx)
+            expected = [tick_to_price(t, decimal_adjustment=decimal_adjustment, yx=yx) for t in ticks]
+            assert result.tolist() == pytest.approx(expected, rel=1e-12)
+
+
 class TestGetClosestTick:
     """Tests for get_closest_tick function."""
 
@@ -65,6 +104,53 @@ class TestGetClosestTick:
         assert result["tick"] == 260220
 
 
+class TestGetSqrtRatioAtTick:
+    """Tests for the integer TickMath port."""
+
+    def test_bounds_match_contract(self):
+        """MIN_TICK and MAX_TICK map to the contract's MIN/MAX_SQRT_RATIO."""
+        assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+        assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+
+    def test_tick_zero(self):
+        """Tick 0 is a price of exactly 1."""
+        assert get_sqrt_ratio_at_tick(0) == 2 ** 96
+
+    def test_close_to_float(self):
+        """Agrees with sqrt(1.0001^tick) * 2^96 in floating point."""
+        for tick in [-260220, -1, 1, 92100, 260220]:
+            expected = 1.0001 ** (tick / 2) * 2 ** 96
+            assert abs(get_sqrt_ratio_at_tick(tick) / expected - 1) < 1e-10
+
+    def test_out_of_range(self):
+        """Ticks beyond MAX_TICK are rejected."""
+        with pytest.raises(ValueError):
+            get_sqrt_ratio_at_tick(MAX_TICK + 1)
+
+
+class TestSqrtPriceMath:
+    """Tests for the Q64.96 SqrtPriceMath helpers."""
+
+    L = 343255264548669212
+    P = 7625888646051765535543132160
+    P_TARGET = 7625888580652810738255925731
+
+    def test_amount0_round_trip(self):
+        """Adding amount0_delta of token 0 moves the price onto the target."""
+        num, den = amount0_delta(self.P, self.P_TARGET, self.L).as_integer_ratio()
+        assert num > 0
+        p_new = next_sqrt_price_from_amount0(self.P, self.L, num, den)
+        # The float amount carries 53 bits, so the landing price is close, not exact
+        assert abs(p_new / self.P_TARGET - 1) < 1e-15
+
+    def test_amount1_round_trip(self):
+        """Adding amount1_delta of token 1 moves the price onto the target."""
+        num, den = amount1_delta(self.P_TARGET, self.P, self.L).as_integer_ratio()
+        assert num > 0
+        p_new = next_sqrt_price_from_amount1(self.P_TARGET, self.L, num, den)
+        assert abs(p_new / self.P - 1) < 1e-15
+
+
 class TestPriceConversions:
     """Tests for sqrtpx96_to_price and price_to_sqrtpx96."""
 
@@ -112,6 +198,49 @@ class TestGetLiquidity:
         assert abs(result / expected - 1) < 0.0001
 
 
+class TestGetLiquidityBatch:
+    """Tests for get_liquidity_batch function."""
+
+    def test_matches_scalar(self):
+        """Batch results match get_liquidity below, in, and above range."""
+        sqrtpx96 = "32211102662183904786754519772954624"
+        tick_lower = [257760, 259000, 250000]
+        tick_upper = [258900, 260000, 255000]
+
+        result = get_liquidity_batch(
+            x=[1, 1, 1],
+            y=[16, 16, 16],
+            sqrtpx96=[sqrtpx96] * 3,
+            decimal_x=1e8,
+            decimal_y=1e18,
+            tick_lower=tick_lower,
+            tick_upper=tick_upper,
+        )
+        for liq, lower, upper in zip(result, tick_lower, tick_upper):
+            expected = get_liquidity(1, 16, sqrtpx96, 1e8, 1e18, lower, upper)
+            assert abs(liq / expected - 1) < 1e-9
+
+
+class TestGetPositionBalance:
+    """Tests for get_position_balance function."""
+
+    def test_mkr_link_balance(self):
+        """
+        MKR/LINK position on Optimism in range -50100 to -39120 with liquidity
+        343255264548669212 should hold ~1.136317 LINK and ~0.005027558 MKR.
+        """
+        result = get_position_balance(
+            position_l="343255264548669212",
+            sqrtpx96="7632249339194475209177795127",
+            tick_lower=-50100,
+            tick_upper=-39120,
+            decimal_x=1e18,
+            decimal_y=1e18,
+        )
+        assert abs(result["token0"] / 1.136317 - 1) < 0.00001
+        assert abs(result["token1"] / 0.005027558 - 1) < 0.00001
+
+
 class TestCheckPositions:
     """Tests for check_positions function."""
 
@@ -128,6 +257,20 @@ class TestCheckPositions:
         assert "active" in result.columns
         # At least one position should be active and one inactive
         assert result["active"].sum() < len(result)
+        # Input table is left untouched by default
+        assert "active" not in ptbl.columns
+
+    def test_in_place(self):
+        """copy=False writes the active flags into the given table."""
+        ptbl = pd.DataFrame({
+            "tick_lower": [256400, 256000, 260160],
+            "tick_upper": [256520, 256100, 260280],
+            "liquidity": [1000000, 2000000, 3000000],
+        })
+        result = check_positions(ptbl, p=0.05, decimal_adjustment=1e10, yx=False, copy=False)
+
+        assert result is ptbl
+        assert ptbl["active"].tolist() == [False, False, True]
 
 
 class TestSwapWithinTick:
@@ -152,6 +295,123 @@ class TestSwapWithinTick:
         assert abs(result["dx"] - (-0.00224477)) / 0.00224477 < 0.01  # Within 1%
 
 
+class TestSwapAcrossTicks:
+    """Tests for swap_across_ticks function."""
+
+    PTBL = pd.DataFrame({
+        "tick_lower": [256800, 257000, 256000, 257100],
+        "tick_upper": [257400, 257200, 258000, 257300],
+        "liquidity": [10**15, 5 * 10**14, 2 * 10**14, 3 * 10**14],
+    })
+    SQRTPX96 = get_sqrt_ratio_at_tick(257050) + 12345
+
+    def test_within_one_tick_matches_swap_within_tick(self):
+        """A small trade never crosses a boundary, so it is one swap_within_tick."""
+        result = swap_across_ticks(
+            ptbl=self.PTBL, sqrtpx96=self.SQRTPX96,
+            dy=0.5, decimal_x=1e8, decimal_y=1e18, fee=0.003,
+        )
+        single = swap_within_tick(
+            l=17 * 10**14, sqrtpx96=self.SQRTPX96,
+            dy=0.5, decimal_x=1e8, decimal_y=1e18, fee=0.003,
+        )
+        assert result["dy_in"] == pytest.approx(single["dy"])
+        assert result["dx_out"] == pytest.approx(single["dx"], rel=1e-9)
+        assert result["fee_tbl"]["yfee"].tolist() == pytest.approx([15 / 17000, 7.5 / 17000, 3 / 17000, 0.0])
+
+    @pytest.mark.parametrize("kwargs", [{"dy": 10.0}, {"dx": 1.0}])
+    def test_crossing_ticks(self, kwargs):
+        """Fees add up across hops and the final active flags reflect the new price."""
+        result = swap_across_ticks(
+            ptbl=self.PTBL, sqrtpx96=self.SQRTPX96,
+            decimal_x=1e8, decimal_y=1e18, fee=0.003, **kwargs,
+        )
+        amount = next(iter(kwargs.values()))
+        if "dy" in kwargs:
+            assert result["new_price"] > self.SQRTPX96
+            assert result["dy_in"] + result["dy_fee"] == pytest.approx(amount)
+            assert result["fee_tbl"]["yfee"].sum() == pytest.approx(result["dy_fee"])
+            assert result["dx_out"] < 0
+            assert result["ptbl"]["active"].tolist() == [True, False, True, True]
+        else:
+            assert result["new_price"] < self.SQRTPX96
+            assert result["dx_in"] + result["dx_fee"] == pytest.approx(amount)
+            assert result["fee_tbl"]["xfee"].sum() == pytest.approx(result["dx_fee"])
+            assert result["dy_out"] < 0
+            assert result["ptbl"]["active"].tolist() == [True, False, True, False]
+
+    def test_no_liquidity_beyond_range(self):
+        """Trading past the last position boundary raises."""
+        with pytest.raises(ValueError):
+            swap_across_ticks(
+                ptbl=self.PTBL, sqrtpx96=self.SQRTPX96,
+                dy=30.0, decimal_x=1e8, decimal_y=1e18, fee=0.003,
+            )
+
+
+class TestSwapAcrossTicksBatch:
+    """Tests for swap_across_ticks_batch function."""
+
+    @pytest.mark.parametrize("key,amounts", [
+        ("dy", [0.0, 0.5, 2.0, 5.0, 10.0]),
+        ("dx", [0.01, 0.1, 0.3, 1.0]),
+    ])
+    def test_matches_scalar(self, key, amounts):
+        """Every candidate matches its own swap_across_ticks call."""
+        ptbl = TestSwapAcrossTicks.PTBL
+        sqrtpx96 = TestSwapAcrossTicks.SQRTPX96
+        result = swap_across_ticks_batch(ptbl, sqrtpx96, decimal_x=1e8, **{key: amounts})
+
+        for row, amount in zip(result.to_dict("records"), amounts):
+            single = swap_across_ticks(ptbl, sqrtpx96, decimal_x=1e8, **{key: amount})
+            for col in result.columns[1:4]:
+                assert row[col] == pytest.approx(single[col], rel=1e-12, abs=1e-15)
+            assert abs(row["new_price"] / single["new_price"] - 1) < 1e-15
+
+    def test_unfillable_amounts(self):
+        """Amounts past the last position boundary are NaN instead of raising."""
+        result = swap_across_ticks_batch(
+            TestSwapAcrossTicks.PTBL, TestSwapAcrossTicks.SQRTPX96,
+            dy=[0.5, 30.0], decimal_x=1e8,
+        )
+        assert result["dx_out"].notna().tolist() == [True, False]
+        assert result["new_price"].iloc[1] is None
+
+    @pytest.mark.parametrize("key,amounts", [
+        ("dy", [0.0, 0.5, 2.0, 5.0]),
+        ("dx", [0.0, 0.01, 0.05]),
+    ])
+    def test_liquidity_gap_matches_scalar(self, key, amounts):
+        """A range without liquidity is crossed the same way in batch and scalar."""
+        ptbl = pd.DataFrame({
+            "tick_lower": [256800, 257300],
+            "tick_upper": [257000, 257600],
+            "liquidity": [10**15, 10**15],
+        })
+        # Start inside the 257000-257300 gap
+        sqrtpx96 = get_sqrt_ratio_at_tick(257150) + 12345
+        result = swap_across_ticks_batch(ptbl, sqrtpx96, decimal_x=1e8, **{key: amounts})
+
+        for row, amount in zip(result.to_dict("records"), amounts):
+            single = swap_across_ticks(ptbl, sqrtpx96, decimal_x=1e8, **{key: amount})
+            for col in result.columns[1:4]:
+                assert row[col] == pytest.approx(single[col], rel=1e-12, abs=1e-15)
+            assert row["new_price"] == single["new_price"]
+
+    def test_scalar_amount(self):
+        """A scalar amount gives a one row frame."""
+        result = swap_across_ticks_batch(
+            TestSwapAcrossTicks.PTBL, TestSwapAcrossTicks.SQRTPX96,
+            dy=2.0, decimal_x=1e8,
+        )
+        single = swap_across_ticks(
+            TestSwapAcrossTicks.PTBL, TestSwapAcrossTicks.SQRTPX96,
+            dy=2.0, decimal_x=1e8,
+        )
+        assert len(result) == 1
+        assert result["dx_out"].iloc[0] == pytest.approx(single["dx_out"], rel=1e-12)
+
+
 class TestSizePriceChangeInTick:
     """Tests for size_price_change_in_tick function."""
 
@@ -195,6 +455,69 @@ class TestCalcFeesFromTrades:
         assert result["amount0_fees"] >= 0
         assert result["amount1_fees"] >= 0
 
+    def test_fee_values(self):
+        """Equal liquidity earns half the fees on positive amounts in range."""
+        trades = pd.DataFrame({
+            "tick": [256450, 256460, 256470, 300000],
+            "amount0_adjusted": [0.1, -0.05, 0.2, 5.0],
+            "amount1_adjusted": [-1.5, 0.8, -2.0, 5.0],
+            "liquidity": [1000000000000000] * 4,
+        })
+        result = calc_fees_from_trades(
+            position_l=1000000000000000,
+            tick_lower=256400,
+            tick_upper=256520,
+            trades=trades,
+            fee=0.003,
+        )
+        # Last trade is out of range and ignored
+        assert result["amount0_fees"] == pytest.approx(0.3 * 0.5 * 0.003)
+        assert result["amount1_fees"] == pytest.approx(0.8 * 0.5 * 0.003)
+
+    def test_sorted_trades(self):
+        """Binary-search path on tick-sorted trades gives the same fees."""
+        trades = pd.DataFrame({
+            "tick": [256300, 256450, 256460, 256470, 300000],
+            "amount0_adjusted": [1.0, 0.1, -0.05, 0.2, 5.0],
+            "amount1_adjusted": [1.0, -1.5, 0.8, -2.0, 5.0],
+            "liquidity": [1000000000000000] * 5,
+        })
+        kwargs = dict(position_l=1000000000000000, tick_lower=256400, tick_upper=256520,
+                      trades=trades, fee=0.003)
+
+        assert calc_fees_from_trades(**kwargs, trades_sorted_by_tick=True) == pytest.approx(
+            calc_fees_from_trades(**kwargs)
+        )
+        # Caller's data is not modified by the in-place arithmetic
+        assert trades["amount0_adjusted"].tolist() == [1.0, 0.1, -0.05, 0.2, 5.0]
+
+
+class TestCalcFeesFromTradesMulti:
+    """Tests for calc_fees_from_trades_multi function."""
+
+    def test_matches_single_position(self):
+        """Each row matches calc_fees_from_trades for that position."""
+        trades = pd.DataFrame({
+            "tick": [256470, 256450, 300000, 256460, 256300],
+            "amount0_adjusted": [0.2, 0.1, 5.0, -0.05, 1.0],
+            "amount1_adjusted": [-2.0, -1.5, 5.0, 0.8, -1.0],
+            "liquidity": [1000000000000000, 2000000000000000, 1000000000000000,
+                          3000000000000000, 1000000000000000],
+        })
+        ptbl = pd.DataFrame({
+            "tick_lower": [256400, 256440, 256000, 290000],
+            "tick_upper": [256520, 256460, 256100, 295000],
+            "liquidity": [1000000000000000, 500000000000000, 7, 1000],
+        })
+        result = calc_fees_from_trades_multi(ptbl, trades, fee=0.003)
+
+        for row in result.itertuples():
+            expected = calc_fees_from_trades(
+                row.liquidity, row.tick_lower, row.tick_upper, trades, fee=0.003
+            )
+            assert row.amount0_fees == pytest.approx(expected["amount0_fees"])
+            assert row.amount1_fees == pytest.approx(expected["amount1_fees"])
+
 
 class TestMatchTokensToRange:
     """Tests for match_tokens_to_range function."""
@@ -219,6 +542,66 @@ class TestMatchTokensToRange:
         assert abs(result["amount_y"] - 16.117809469) / 16.117809469 < 0.01
 
 
+class TestMatchTokensToRangeBatch:
+    """Tests for match_tokens_to_range_batch function."""
+
+    SQRTPX96 = "32211102662183904786754519772954624"
+
+    @pytest.mark.parametrize("given", ["x", "y"])
+    def test_matches_scalar(self, given):
+        """Each row matches match_tokens_to_range for the same inputs."""
+        amounts = [1.0, 0.25, 16.0]
+        tick_lower = [257760, 257000, 250000]
+        tick_upper = 258900
+        kwargs = {"x": None, "y": None}
+        kwargs[given] = amounts
+        result = match_tokens_to_range_batch(
+            sqrtpx96=self.SQRTPX96, decimal_x=1e8, decimal_y=1e18,
+            tick_lower=tick_lower, tick_upper=tick_upper, **kwargs
+        )
+        for i, amount in enumerate(amounts):
+            kwargs[given] = amount
+            expected = match_tokens_to_range(
+                sqrtpx96=self.SQRTPX96, decimal_x=1e8, decimal_y=1e18,
+                tick_lower=tick_lower[i], tick_upper=tick_upper, **kwargs
+            )
+            assert result["amount_x"][i] == pytest.approx(expected["amount_x"], rel=1e-9)
+            assert result["amount_y"][i] == pytest.approx(expected["amount_y"], rel=1e-9)
+
+    def test_scalar_inputs(self):
+        """All-scalar inputs give a one row frame."""
+        kwargs = dict(x=1.0, y=None, sqrtpx96=self.SQRTPX96, decimal_x=1e8, decimal_y=1e18,
+                      tick_lower=257760, tick_upper=258900)
+        result = match_tokens_to_range_batch(**kwargs)
+        expected = match_tokens_to_range(**kwargs)
+        assert len(result) == 1
+        assert result["amount_y"][0] == pytest.approx(expected["amount_y"], rel=1e-9)
+
+
+class TestMakeRangeMatcher:
+    """Tests for make_range_matcher function."""
+
+    def test_matches_match_tokens_to_range(self):
+        """The specialized matcher returns exactly what match_tokens_to_range does."""
+        match = make_range_matcher(decimal_x=1e8, decimal_y=1e18,
+                                   tick_lower=257760, tick_upper=258900)
+        for sqrtpx96 in ["32211102662183904786754519772954624", 32311102662183904786754519772954624]:
+            for x, y in [(1, None), (None, 16.117809469)]:
+                assert match(x, y, sqrtpx96) == match_tokens_to_range(
+                    x=x, y=y, sqrtpx96=sqrtpx96, decimal_x=1e8, decimal_y=1e18,
+                    tick_lower=257760, tick_upper=258900
+                )
+
+    def test_requires_one_amount(self):
+        """Exactly one of x and y must be given."""
+        match = make_range_matcher(decimal_x=1e8, decimal_y=1e18,
+                                   tick_lower=257760, tick_upper=258900)
+        with pytest.raises(ValueError):
+            match(None, None, "32211102662183904786754519772954624")
+        with pytest.raises(ValueError):
+            match(1, 1, "32211102662183904786754519772954624")
+
+
 class TestPriceAllTokens:
     """Tests for price_all_tokens function."""
 
@@ -241,6 +624,50 @@ class TestPriceAllTokens:
         assert abs(result["tick_lower"] - 257760) < 10  # Within 10 ticks
 
 
+class TestPriceAllTokensBatch:
+    """Tests for price_all_tokens_batch function."""
+
+    SQRTPX96 = "32211102662183904786754519772954624"
+
+    @pytest.mark.parametrize("known", ["tick_lower", "tick_upper"])
+    def test_matches_scalar(self, known):
+        """Each row matches price_all_tokens for the same inputs."""
+        xs = [1.0, 0.5, 2.0]
+        ys = [16.11781, 4.0, 20.0]
+        tick = 257000 if known == "tick_lower" else 258900
+        result = price_all_tokens_batch(xs, ys, self.SQRTPX96, 1e8, 1e18, **{known: tick})
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            expected = price_all_tokens(x, y, self.SQRTPX96, 1e8, 1e18, **{known: tick})
+            assert result["tick_lower"][i] == expected["tick_lower"]
+            assert result["tick_upper"][i] == expected["tick_upper"]
+            assert result["price_lower"][i] == pytest.approx(expected["price_lower"], rel=1e-9)
+            assert result["price_upper"][i] == pytest.approx(expected["price_upper"], rel=1e-9)
+
+    def test_no_valid_range_is_na(self):
+        """Amounts that admit no range give a missing tick instead of raising."""
+        result = price_all_tokens_batch([1.0, 0.0], [16.11781, 5.0], self.SQRTPX96, 1e8, 1e18,
+                                        tick_upper=258900)
+        assert abs(result["tick_lower"][0] - 257760) < 10
+        assert pd.isna(result["tick_lower"][1])
+
+    def test_float32_keeps_ticks(self):
+        """float32 columns still round the unknown tick to the float64 answer."""
+        xs = [1.0, 0.5, 2.0]
+        ys = [16.11781, 4.0, 20.0]
+        wide = price_all_tokens_batch(xs, ys, self.SQRTPX96, 1e8, 1e18, tick_upper=258900)
+        narrow = price_all_tokens_batch(xs, ys, self.SQRTPX96, 1e8, 1e18, tick_upper=258900,
+                                        dtype=np.float32)
+        assert narrow["price_lower"].dtype == np.float32
+        assert list(narrow["tick_lower"]) == list(wide["tick_lower"])
+
+    def test_scalar_inputs(self):
+        """All-scalar inputs give a one row frame."""
+        result = price_all_tokens_batch(1.0, 16.11781, self.SQRTPX96, 1e8, 1e18, tick_upper=258900)
+        expected = price_all_tokens(1.0, 16.11781, self.SQRTPX96, 1e8, 1e18, tick_upper=258900)
+        assert len(result) == 1
+        assert result["tick_lower"][0] == expected["tick_lower"]
+
+
 class TestFindRecalculationPrice:
     """Tests for find_recalculation_price function."""
 
@@ -263,5 +690,84 @@ class TestFindRecalculationPrice:
         assert result > 39.36252
 
 
+class TestFindRecalculationPricesBatch:
+    """Tests for find_recalculation_prices_batch function."""
+
+    PTBL = pd.DataFrame({
+        "tick_lower": [92100, 256000],
+        "tick_upper": [267180, 267500],
+        "liquidity": [1000000, 2000000],
+    })
+
+    @pytest.mark.parametrize("price_up", [True, False])
+    @pytest.mark.parametrize("yx", [True, False])
+    def test_matches_scalar(self, price_up, yx):
+        """Each entry matches find_recalculation_price for the same price."""
+        ps = [39.36252, 20.0, 1.5, 30.0]
+        if not yx:
+            ps = [1 / p for p in ps]
+        result = find_recalculation_prices_batch(self.PTBL, ps, price_up, 1e10, yx)
+        for p, r in zip(ps, result):
+            expected = find_recalculation_price(self.PTBL, p, price_up, 1e10, yx)
+            assert r == pytest.approx(expected, rel=1e-12)
+
+    def test_no_boundary_is_nan(self):
+        """Prices with no boundary in the direction of travel give NaN."""
+        result = find_recalculation_prices_batch(self.PTBL, [1e-4, 1e6], True, 1e10)
+        assert not math.isnan(result[0])
+        assert math.isnan(result[1])
+
+    @pytest.mark.parametrize("price_up", [True, False])
+    @pytest.mark.parametrize("yx", [True, False])
+    def test_invalid_price_is_nan(self, price_up, yx):
+        """NaN and zero prices give NaN, not a boundary, and don't warn."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = find_recalculation_prices_batch(self.PTBL, [math.nan, 0.0], price_up, 1e10, yx)
+        assert math.isnan(result[0])
+        assert math.isnan(result[1])
+
+
+class TestTickIndex:
+    """Tests for TickIndex."""
+
+    PTBL = pd.DataFrame({
+        "tick_lower": [92100, 256000, 256000],
+        "tick_upper": [267180, 267500, 267180],
+        "liquidity": [1000000, 2000000, 3000000],
+    })
+
+    def test_neighbours(self):
+        """Lookups return the closest boundary strictly above or below."""
+        index = TickIndex(self.PTBL)
+        assert list(index.ticks) == [92100, 256000, 267180, 267500]
+        assert index.next_above(256000) == 267180
+        assert index.next_below(256000) == 92100
+        assert index.next_below(256001) == 256000
+        with pytest.raises(ValueError):
+            index.next_above(267500)
+        with pytest.raises(ValueError):
+            index.next_below(92100)
+
+    def test_matches_dataframe(self):
+        """find_recalculation_price gives the same answer from a TickIndex."""
+        index = TickIndex(self.PTBL)
+        for price_up in (True, False):
+            for yx in (True, False):
+                p = 39.36252 if yx else 1 / 39.36252
+                assert find_recalculation_price(
+                    index, p, price_up, 1e10, yx
+                ) == find_recalculation_price(self.PTBL, p, price_up, 1e10, yx)
+
+    def test_recalculation_price_from_tick(self):
+        """recalculation_price from the current tick matches find_recalculation_price."""
+        index = TickIndex(self.PTBL)
+        tick = get_closest_tick(39.36252, tick_spacing=1, decimal_adjustment=1e10)["tick"]
+        for price_up in (True, False):
+            assert index.recalculation_price(tick, price_up, 1e10) == find_recalculation_price(
+                index, 39.36252, price_up, 1e10
+            )
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
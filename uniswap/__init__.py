@@ -5,26 +5,44 @@ This package provides Python implementations of Uniswap V3 mathematical function
 for price/tick conversions, liquidity calculations, swap simulations, and fee calculations.
 """
 
-from .tick import tick_to_price, get_closest_tick
+from .tick import tick_to_price, tick_to_price_batch, get_closest_tick
 from .price import sqrtpx96_to_price, price_to_sqrtpx96
-from .liquidity import get_liquidity, get_position_balance, check_positions
-from .swap import swap_within_tick, swap_across_ticks, size_price_change_in_tick
-from .fees import calc_fees_from_trades
-from .utils import find_recalculation_price, match_tokens_to_range, price_all_tokens
+from .liquidity import get_liquidity, get_liquidity_batch, get_position_balance, check_positions
+from .swap import swap_within_tick, swap_across_ticks, swap_across_ticks_batch, size_price_change_in_tick
+from .fees import calc_fees_from_trades, calc_fees_from_trades_multi
+from .utils import (
+    TickIndex,
+    find_recalculation_price,
+    find_recalculation_prices_batch,
+    match_tokens_to_range,
+    match_tokens_to_range_batch,
+    make_range_matcher,
+    price_all_tokens,
+    price_all_tokens_batch,
+)
 
 __all__ = [
     "tick_to_price",
+    "tick_to_price_batch",
     "get_closest_tick",
     "sqrtpx96_to_price",
     "price_to_sqrtpx96",
     "get_liquidity",
+    "get_liquidity_batch",
     "get_position_balance",
     "check_positions",
     "swap_within_tick",
     "swap_across_ticks",
+    "swap_across_ticks_batch",
     "size_price_change_in_tick",
     "calc_fees_from_trades",
+    "calc_fees_from_trades_multi",
     "find_recalculation_price",
+    "find_recalculation_prices_batch",
     "match_tokens_to_range",
+    "match_tokens_to_range_batch",
+    "make_range_matcher",
     "price_all_tokens",
+    "price_all_tokens_batch",
+    "TickIndex",
 ]
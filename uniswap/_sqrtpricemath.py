@@ -0,0 +1,89 @@
+"""
+Q64.96 square root price math modeled on Uniswap V3's SqrtPriceMath.sol.
+
+All prices are sqrtPriceX96 big integers. Next prices are floored integers like
+the contract's; token amount deltas are returned as correctly rounded floats of
+the exact ratio, in raw token units, so callers convert to float in one place.
+Input amounts may carry a power-of-2 denominator (num / den, as returned by
+float.as_integer_ratio) so fractional raw amounts stay exact.
+"""
+
+from .price import Q96
+
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    """Calculate floor(a * b / denominator) like FullMath.mulDiv (Python ints cannot overflow)."""
+    return a * b // denominator
+
+
+def next_sqrt_price_from_amount0(sqrtpx96: int, liquidity: int, num: int, den: int = 1) -> int:
+    """
+    Calculate the sqrt price after adding num / den raw units of token 0.
+
+    From 1/P_new = dx/L + 1/P: P_new = L * P * 2^96 / (L * 2^96 + dx * P).
+
+    Args:
+        sqrtpx96: Current price in sqrtPriceX96 format.
+        liquidity: Active liquidity, as big integer.
+        num: Numerator of the raw token 0 amount. Negative to remove token 0.
+        den: Denominator of the raw token 0 amount. Default 1.
+
+    Returns:
+        New sqrtPriceX96, floored.
+    """
+    numerator = liquidity * den << 96
+    return mul_div(numerator, sqrtpx96, numerator + num * sqrtpx96)
+
+
+def next_sqrt_price_from_amount1(sqrtpx96: int, liquidity: int, num: int, den: int = 1) -> int:
+    """
+    Calculate the sqrt price after adding num / den raw units of token 1.
+
+    From P_new = dy/L + P: P_new = P + dy * 2^96 / L.
+
+    Args:
+        sqrtpx96: Current price in sqrtPriceX96 format.
+        liquidity: Active liquidity, as big integer.
+        num: Numerator of the raw token 1 amount. Negative to remove token 1.
+        den: Denominator of the raw token 1 amount. Default 1.
+
+    Returns:
+        New sqrtPriceX96, floored.
+    """
+    return sqrtpx96 + mul_div(num, Q96, liquidity * den)
+
+
+def amount0_delta(sqrtpx96_a: int, sqrtpx96_b: int, liquidity: int) -> float:
+    """
+    Calculate the token 0 added to the pool moving the price from a to b.
+
+    dx = L * (1/P_b - 1/P_a) = L * (P_a - P_b) * 2^96 / (P_a * P_b). Positive when
+    the price falls (token 0 added), negative when it rises (token 0 removed).
+
+    Args:
+        sqrtpx96_a: Starting price in sqrtPriceX96 format.
+        sqrtpx96_b: Ending price in sqrtPriceX96 format.
+        liquidity: Active liquidity, as big integer.
+
+    Returns:
+        Raw (not decimal adjusted) amount of token 0.
+    """
+    return (liquidity * (sqrtpx96_a - sqrtpx96_b) << 96) / (sqrtpx96_a * sqrtpx96_b)
+
+
+def amount1_delta(sqrtpx96_a: int, sqrtpx96_b: int, liquidity: int) -> float:
+    """
+    Calculate the token 1 added to the pool moving the price from a to b.
+
+    dy = L * (P_b - P_a) / 2^96. Positive when the price rises (token 1 added),
+    negative when it falls (token 1 removed).
+
+    Args:
+        sqrtpx96_a: Starting price in sqrtPriceX96 format.
+        sqrtpx96_b: Ending price in sqrtPriceX96 format.
+        liquidity: Active liquidity, as big integer.
+
+    Returns:
+        Raw (not decimal adjusted) amount of token 1.
+    """
+    return (sqrtpx96_b - sqrtpx96_a) * liquidity / Q96
@@ -0,0 +1,29 @@
+"""
+Cached tick to sqrtPriceX96 lookups for Uniswap V3.
+
+Position boundaries are a small set of ticks that get converted again and again
+(every liquidity calculation, every price snapshot), so each tick's sqrtPriceX96
+is computed once and then served from a lookup table.
+"""
+
+from functools import lru_cache
+
+from ._tickmath import get_sqrt_ratio_at_tick
+
+
+@lru_cache(maxsize=1 << 16)
+def sqrtpx96_at_tick(tick: int) -> int:
+    """
+    Convert a tick straight to sqrtPriceX96, memoized per tick.
+
+    Equivalent to price_to_sqrtpx96(tick_to_price(tick, d), decimal_adjustment=d)
+    (the decimal adjustment cancels), but computed with the pool contract's
+    integer TickMath so the value matches on-chain exactly.
+
+    Args:
+        tick: The numeric tick, e.g., 204232.
+
+    Returns:
+        Big integer price in sqrtPriceX96 format.
+    """
+    return get_sqrt_ratio_at_tick(tick)
@@ -2,7 +2,9 @@
 Fee calculation functions for Uniswap V3.
 """
 
+import math
 from typing import TypedDict, Union
+import numpy as np
 import pandas as pd
 
 
@@ -17,7 +19,8 @@ def calc_fees_from_trades(
     tick_lower: int,
     tick_upper: int,
     trades: pd.DataFrame,
-    fee: float = 0.003
+    fee: float = 0.003,
+    trades_sorted_by_tick: bool = False
 ) -> FeesResult:
     """
     Calculate fee rewards from trades occurring within a position's range.
@@ -32,6 +35,9 @@ def calc_fees_from_trades(
         trades: Trades table with columns: tick, amount0_adjusted, amount1_adjusted, liquidity.
             Negative values = tokens bought, Positive values = tokens sold by user to pool.
         fee: The pool fee, default 0.3% (0.003). Generally one of: 0.0001, 0.0005, 0.003, 0.01
+        trades_sorted_by_tick: Set True if trades is already sorted by tick. The
+            in-range trades are then located with a binary search and read as one
+            contiguous block instead of comparing every row. Default False.
 
     Returns:
         A dict with amount0_fees (in x units, e.g., WBTC) and amount1_fees (in y units, e.g., WETH).
@@ -55,32 +61,97 @@ def calc_fees_from_trades(
     position_l = int(position_l)
 
     # Filter to relevant trades within the tick range
-    relevant_trades = trades[
-        (trades["tick"] >= tick_lower) & (trades["tick"] <= tick_upper)
-    ].copy()
+    tick = trades["tick"].to_numpy()
+    if trades_sorted_by_tick:
+        lo = np.searchsorted(tick, tick_lower, side="left")
+        hi = np.searchsorted(tick, tick_upper, side="right")
+        in_range = np.arange(lo, hi)
+    else:
+        in_range = np.flatnonzero((tick >= tick_lower) & (tick <= tick_upper))
 
-    if len(relevant_trades) == 0:
+    if in_range.size == 0:
         return FeesResult(amount0_fees=0.0, amount1_fees=0.0)
 
+    amount0 = trades["amount0_adjusted"].to_numpy(dtype=float)[in_range]
+    amount1 = trades["amount1_adjusted"].to_numpy(dtype=float)[in_range]
+    liquidity = trades["liquidity"].to_numpy(dtype=float)[in_range]
+
+    # Indexing with an index array already returned fresh arrays, so the remaining
+    # steps write into them in place rather than allocating temporaries
+
     # Calculate liquidity fraction for each trade
-    relevant_trades["liquidity_fraction"] = position_l / (
-        relevant_trades["liquidity"].astype(float) + position_l
-    )
+    liquidity_fraction = np.add(liquidity, position_l, out=liquidity)
+    np.divide(position_l, liquidity_fraction, out=liquidity_fraction)
 
     # Calculate fees from positive amounts (tokens sold to pool by traders)
-    positive_amount0 = relevant_trades[relevant_trades["amount0_adjusted"] > 0]
-    amount0_fees = (
-        (positive_amount0["amount0_adjusted"] * positive_amount0["liquidity_fraction"]).sum()
-        * fee
-    )
+    np.maximum(amount0, 0.0, out=amount0)
+    np.maximum(amount1, 0.0, out=amount1)
+    np.multiply(amount0, liquidity_fraction, out=amount0)
+    np.multiply(amount1, liquidity_fraction, out=amount1)
 
-    positive_amount1 = relevant_trades[relevant_trades["amount1_adjusted"] > 0]
-    amount1_fees = (
-        (positive_amount1["amount1_adjusted"] * positive_amount1["liquidity_fraction"]).sum()
-        * fee
-    )
+    # fsum is exactly rounded, so totals don't depend on trade order
+    amount0_fees = math.fsum(amount0) * fee
+    amount1_fees = math.fsum(amount1) * fee
 
     return FeesResult(
         amount0_fees=float(amount0_fees),
         amount1_fees=float(amount1_fees)
     )
+
+
+def calc_fees_from_trades_multi(
+    ptbl: pd.DataFrame,
+    trades: pd.DataFrame,
+    fee: float = 0.003
+) -> pd.DataFrame:
+    """
+    Calculate fee rewards for many positions from one pass over the trades.
+
+    Equivalent to calling calc_fees_from_trades for every row of ptbl, but the
+    trades are sorted by tick once and each position reads only the contiguous
+    slice of trades inside its range (found with a binary search), instead of
+    rescanning the whole trades table per position.
+
+    Args:
+        ptbl: Liquidity positions table with columns tick_lower, tick_upper, liquidity.
+        trades: Trades table with columns: tick, amount0_adjusted, amount1_adjusted, liquidity.
+            Negative values = tokens bought, Positive values = tokens sold by user to pool.
+        fee: The pool fee, default 0.3% (0.003). Generally one of: 0.0001, 0.0005, 0.003, 0.01
+
+    Returns:
+        The positions table with new amount0_fees and amount1_fees columns.
+
+    Examples:
+        >>> ptbl = pd.DataFrame({
+        ...     'tick_lower': [256400, 256440],
+        ...     'tick_upper': [256520, 256460],
+        ...     'liquidity': [1429022391989675, 500000000000000]
+        ... })
+        >>> calc_fees_from_trades_multi(ptbl, trades, fee=0.003)
+        # Returns ptbl with amount0_fees and amount1_fees per position
+    """
+    # Sort trades by tick once so every position range is a contiguous slice
+    tick = trades["tick"].to_numpy()
+    order = np.argsort(tick, kind="stable")
+    tick = tick[order]
+    amount0 = np.maximum(trades["amount0_adjusted"].to_numpy(dtype=float)[order], 0.0)
+    amount1 = np.maximum(trades["amount1_adjusted"].to_numpy(dtype=float)[order], 0.0)
+    liquidity = trades["liquidity"].to_numpy(dtype=float)[order]
+
+    start = np.searchsorted(tick, ptbl["tick_lower"].to_numpy(), side="left")
+    stop = np.searchsorted(tick, ptbl["tick_upper"].to_numpy(), side="right")
+
+    amount0_fees = np.zeros(len(ptbl))
+    amount1_fees = np.zeros(len(ptbl))
+
+    for i, (lo, hi, position_l) in enumerate(zip(start, stop, ptbl["liquidity"])):
+        if lo >= hi:
+            continue
+
+        position_l = int(position_l)
+        liquidity_fraction = position_l / (liquidity[lo:hi] + position_l)
+
+        amount0_fees[i] = math.fsum(amount0[lo:hi] * liquidity_fraction) * fee
+        amount1_fees[i] = math.fsum(amount1[lo:hi] * liquidity_fraction) * fee
+
+    return ptbl.assign(amount0_fees=amount0_fees, amount1_fees=amount1_fees)
@@ -3,10 +3,12 @@ Liquidity calculation functions for Uniswap V3.
 """
 
 from typing import TypedDict, Union
+import numpy as np
 import pandas as pd
 
-from .tick import tick_to_price, get_closest_tick
-from .price import price_to_sqrtpx96
+from .tick import _closest_tick_int
+from .price import Q96
+from ._tick_lut import sqrtpx96_at_tick
 
 
 class PositionBalance(TypedDict):
@@ -15,6 +17,36 @@ class PositionBalance(TypedDict):
     token1: float
 
 
+def _get_liq_amount0(mintickx96: int, maxtickx96: int, amount0: int) -> int:
+    """Liquidity for an amount of token 0 between two ordered sqrtPriceX96 values."""
+    # Floor division by 2^96 of a non-negative int is exactly a right shift
+    intermediate = (mintickx96 * maxtickx96) >> 96
+    return amount0 * intermediate // (maxtickx96 - mintickx96)
+
+
+def _get_liq_amount1(mintickx96: int, maxtickx96: int, amount1: int) -> int:
+    """Liquidity for an amount of token 1 between two ordered sqrtPriceX96 values."""
+    return amount1 * Q96 // (maxtickx96 - mintickx96)
+
+
+def _get_liq(
+    current_pricex96: int,
+    mintickx96: int,
+    maxtickx96: int,
+    amount0: int,
+    amount1: int
+) -> int:
+    """Liquidity for both token amounts given where the current price sits in the range."""
+    if current_pricex96 <= mintickx96:
+        return _get_liq_amount0(mintickx96, maxtickx96, amount0)
+    elif current_pricex96 < maxtickx96:
+        liq0 = _get_liq_amount0(current_pricex96, maxtickx96, amount0)
+        liq1 = _get_liq_amount1(mintickx96, current_pricex96, amount1)
+        return min(liq0, liq1)
+    else:
+        return _get_liq_amount1(mintickx96, maxtickx96, amount1)
+
+
 def get_liquidity(
     x: float,
     y: float,
@@ -54,58 +86,99 @@ def get_liquidity(
         ... )
         1429022393248418  # Within 0.0001%
     """
-    sqrtpx96 = int(sqrtpx96)
-    decimal_adjustment = max(decimal_y / decimal_x, decimal_x / decimal_y)
+    # Skip the conversion for plain ints, the common case in iterative callers
+    sqrtpx96 = sqrtpx96 if type(sqrtpx96) is int else int(sqrtpx96)
 
-    mintickx96 = price_to_sqrtpx96(
-        p=tick_to_price(tick=tick_lower, decimal_adjustment=decimal_adjustment),
-        decimal_adjustment=decimal_adjustment
-    )
-    maxtickx96 = price_to_sqrtpx96(
-        p=tick_to_price(tick=tick_upper, decimal_adjustment=decimal_adjustment),
-        decimal_adjustment=decimal_adjustment
-    )
-
-    if mintickx96 == maxtickx96:
+    if tick_lower == tick_upper:
         return 0
 
-    def get_liq_amount0(mintickx96: int, maxtickx96: int, amount0: float) -> int:
-        if mintickx96 > maxtickx96:
-            mintickx96, maxtickx96 = maxtickx96, mintickx96
-        intermediate = (mintickx96 * maxtickx96) // (2 ** 96)
-        return int(amount0 * intermediate // (maxtickx96 - mintickx96))
-
-    def get_liq_amount1(mintickx96: int, maxtickx96: int, amount1: float) -> int:
-        if mintickx96 > maxtickx96:
-            mintickx96, maxtickx96 = maxtickx96, mintickx96
-        return int(amount1 * (2 ** 96) // (maxtickx96 - mintickx96))
-
-    def get_liq(
-        current_pricex96: int,
-        mintickx96: int,
-        maxtickx96: int,
-        amount0: float,
-        amount1: float
-    ) -> int:
-        if mintickx96 > maxtickx96:
-            mintickx96, maxtickx96 = maxtickx96, mintickx96
-
-        if current_pricex96 <= mintickx96:
-            return get_liq_amount0(mintickx96, maxtickx96, amount0)
-        elif current_pricex96 < maxtickx96:
-            liq0 = get_liq_amount0(current_pricex96, maxtickx96, amount0)
-            liq1 = get_liq_amount1(mintickx96, current_pricex96, amount1)
-            return min(liq0, liq1)
-        else:
-            return get_liq_amount1(mintickx96, maxtickx96, amount1)
-
-    return get_liq(
+    # Order the boundaries once here so the helpers never have to
+    if tick_lower > tick_upper:
+        tick_lower, tick_upper = tick_upper, tick_lower
+
+    mintickx96 = sqrtpx96_at_tick(tick_lower)
+    maxtickx96 = sqrtpx96_at_tick(tick_upper)
+
+    return _get_liq(
         current_pricex96=sqrtpx96,
         mintickx96=mintickx96,
         maxtickx96=maxtickx96,
-        amount0=x * decimal_x,
-        amount1=y * decimal_y
+        # Whole token units keep the big-int math exact, no float rounding
+        amount0=int(round(x * decimal_x)),
+        amount1=int(round(y * decimal_y))
+    )
+
+
+def get_liquidity_batch(
+    x: np.ndarray,
+    y: np.ndarray,
+    sqrtpx96: np.ndarray,
+    decimal_x: float = 1e18,
+    decimal_y: float = 1e18,
+    tick_lower: np.ndarray = 0,
+    tick_upper: np.ndarray = 0
+) -> np.ndarray:
+    """
+    Calculate the liquidity of many positions at once from their token amounts.
+
+    Vectorized form of get_liquidity. Every argument except the decimals may be a
+    1D array (or anything np.asarray accepts, including pandas Series); scalars
+    are broadcast.
+
+    Args:
+        x: Numbers of token 0 for each position.
+        y: Numbers of token 1 for each position.
+        sqrtpx96: Current prices in uint160 format. Big ints, strings, or floats.
+        decimal_x: The decimals used in token 0, e.g., 1e6 for USDC, 1e8 for WBTC.
+        decimal_y: The decimals used in token 1, e.g., 1e18 for WETH.
+        tick_lower: The low ticks of the positions.
+        tick_upper: The upper ticks of the positions.
+
+    Returns:
+        A float64 array of liquidity per position. Liquidity routinely exceeds
+        int64, so values are floats accurate to ~1e-15 relative; use get_liquidity
+        when the exact big integer is needed.
+
+    Examples:
+        >>> get_liquidity_batch(
+        ...     x=[1, 2], y=[16.117809469, 32.235618938],
+        ...     sqrtpx96='32211102662183904786754519772954624',
+        ...     decimal_x=1e8, decimal_y=1e18,
+        ...     tick_lower=257760, tick_upper=258900
+        ... )
+        array([1.42902239e+15, 2.85804479e+15])
+    """
+    amount0 = np.asarray(x, dtype=np.float64) * decimal_x
+    amount1 = np.asarray(y, dtype=np.float64) * decimal_y
+    sqrt_p = np.asarray(sqrtpx96, dtype=np.float64) / Q96
+
+    # Convert each distinct boundary tick once through the lookup table
+    ticks, inverse = np.unique(
+        np.concatenate([np.atleast_1d(tick_lower), np.atleast_1d(tick_upper)]),
+        return_inverse=True
     )
+    sqrt_ticks = np.array([sqrtpx96_at_tick(int(t)) for t in ticks], dtype=np.float64) / Q96
+    sqrt_bounds = sqrt_ticks[inverse]
+    n_lower = np.atleast_1d(tick_lower).size
+    sqrt_a = np.minimum(sqrt_bounds[:n_lower], sqrt_bounds[n_lower:])
+    sqrt_b = np.maximum(sqrt_bounds[:n_lower], sqrt_bounds[n_lower:])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Price below range: all token 0
+        below = amount0 * sqrt_a * sqrt_b / (sqrt_b - sqrt_a)
+        # Price in range: the smaller of the two sides
+        liq0 = amount0 * sqrt_p * sqrt_b / (sqrt_b - sqrt_p)
+        liq1 = amount1 / (sqrt_p - sqrt_a)
+        # Price above range: all token 1
+        above = amount1 / (sqrt_b - sqrt_a)
+
+        liquidity = np.select(
+            [sqrt_p <= sqrt_a, sqrt_p < sqrt_b],
+            [below, np.minimum(liq0, liq1)],
+            default=above
+        )
+
+    return np.where(sqrt_a == sqrt_b, 0.0, liquidity)
 
 
 def get_position_balance(
@@ -145,18 +218,13 @@ def get_position_balance(
     # Import here to avoid circular dependency
     from .swap import size_price_change_in_tick
 
-    position_l = int(position_l)
-    sqrtpx96 = int(sqrtpx96)
-    decimal_adjustment = max(decimal_y / decimal_x, decimal_x / decimal_y)
+    position_l = position_l if type(position_l) is int else int(position_l)
+    sqrtpx96 = sqrtpx96 if type(sqrtpx96) is int else int(sqrtpx96)
 
-    price_lower = price_to_sqrtpx96(
-        p=tick_to_price(tick_lower, decimal_adjustment=decimal_adjustment),
-        decimal_adjustment=decimal_adjustment
-    )
-    price_upper = price_to_sqrtpx96(
-        p=tick_to_price(tick_upper, decimal_adjustment=decimal_adjustment),
-        decimal_adjustment=decimal_adjustment
-    )
+    # Boundaries are memoized per tick, so repeated valuations of the same
+    # position only pay for the conversion once
+    price_lower = sqrtpx96_at_tick(tick_lower)
+    price_upper = sqrtpx96_at_tick(tick_upper)
 
     # If price is above range, you're all token 1
     if sqrtpx96 >= price_upper:
@@ -213,7 +281,8 @@ def check_positions(
     ptbl: pd.DataFrame,
     p: float,
     decimal_adjustment: float = 1.0,
-    yx: bool = True
+    yx: bool = True,
+    copy: bool = True
 ) -> pd.DataFrame:
     """
     Flag liquidity positions as active or not active at a specific price.
@@ -223,6 +292,8 @@ def check_positions(
         p: Specific price in human readable format.
         decimal_adjustment: The difference in the tokens decimals, e.g., 1e10 for ETH vs BTC.
         yx: Whether price is already in Token 1 / Token 0 format or inverted. Default True.
+        copy: Return a copy of ptbl (True) or write the 'active' column into ptbl
+            itself (False). Default True.
 
     Returns:
         The liquidity positions table with a new 'active' column indicating whether
@@ -242,10 +313,15 @@ def check_positions(
 
     # For making positions, tick_spacing=1 is only valid for 0.01% pools,
     # but this works for inside a valid range
-    tick_target = get_closest_tick(p, tick_spacing=1, decimal_adjustment=decimal_adjustment, yx=yx)
-    target_tick = tick_target["tick"]
+    target_tick = _closest_tick_int(p if yx else 1.0 / p, decimal_adjustment)
+
+    tick_lower = ptbl["tick_lower"].to_numpy()
+    tick_upper = ptbl["tick_upper"].to_numpy()
+    active = (tick_lower <= target_tick) & (tick_upper >= target_tick)
 
-    result = ptbl.copy()
-    result["active"] = (result["tick_lower"] <= target_tick) & (result["tick_upper"] >= target_tick)
+    if not copy:
+        ptbl["active"] = active
+        return ptbl
 
-    return result
+    # assign shares the existing columns instead of deep-copying the whole table
+    return ptbl.assign(active=active)
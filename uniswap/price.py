@@ -6,9 +6,23 @@ Uniswap stores prices as square roots in 64.96 fixed-point format
 """
 
 import math
+from functools import lru_cache
 from typing import Union
 
+# Fixed-point scales for sqrtPriceX96 (Q64.96) and its square
+Q96 = 1 << 96
+Q192 = 1 << 192
 
+
+# A session only ever sees a handful of token pairs
+@lru_cache(maxsize=32)
+def _decimal_adjustment(decimal_x: float, decimal_y: float) -> float:
+    """Difference in the tokens decimals, e.g., 1e10 for WBTC (1e8) vs WETH (1e18)."""
+    return max(decimal_y / decimal_x, decimal_x / decimal_y)
+
+
+# Swap simulations convert the same boundary prices over and over
+@lru_cache(maxsize=8192)
 def price_to_sqrtpx96(
     p: float,
     invert: bool = False,
@@ -28,9 +42,9 @@ def price_to_sqrtpx96(
         Big integer price in sqrtPriceX96 format.
 
     Note:
-        Small amount of precision loss (<0.001%) possible due to not adjusting for
-        Solidity implementation of Chinese Remainder Theorem as Solidity uses
-        fixed-point math.
+        Computed as an integer square root of the scaled price, so the only
+        precision loss comes from the float input itself (<0.001% for typical
+        human readable prices).
 
     Examples:
         >>> # For Ethereum Mainnet ETH-USDC 0.05% V3 Pool:
@@ -38,16 +52,18 @@ def price_to_sqrtpx96(
         >>> # invert=True because pool is actually ETH/USDC (Token 1 / Token 0)
         >>> # USDC is 6 decimals while ETH is 18 decimals (18-6 = 12)
         >>> price_to_sqrtpx96(1825.732, invert=True, decimal_adjustment=1e12)
-        1854219183615346559398951258161152  # 99.99999% accurate
+        1854219183615346525614922871428098  # 99.99999% accurate
     """
     if invert:
         p = 1.0 / p
 
-    # sqrt(P * decimal_adjustment) * 2^96
-    sqrt_price = math.sqrt(p * decimal_adjustment)
-    return int(sqrt_price * (2 ** 96))
+    # sqrt(P * decimal_adjustment * 2^192), taken as an integer square root so
+    # the result keeps full precision instead of a 53-bit float scaled by 2^96
+    return math.isqrt(int(p * decimal_adjustment * Q192))
 
 
+# Pool snapshots and position sizing repeat the same slot0 price many times
+@lru_cache(maxsize=8192)
 def sqrtpx96_to_price(
     sqrtpx96: Union[int, str],
     invert: bool = False,
@@ -67,9 +83,8 @@ def sqrtpx96_to_price(
         Human readable decimal price in desired format (1/0 or 0/1 if invert=True).
 
     Note:
-        Small amount of precision loss (<0.01%) possible due to not adjusting for
-        Solidity implementation of Chinese Remainder Theorem as Solidity uses
-        fixed-point math.
+        The square is taken in exact integer arithmetic, so the only rounding is
+        the final conversion to a float.
 
     Examples:
         >>> # For Ethereum Mainnet ETH-USDC 0.05% V3 Pool:
@@ -78,10 +93,11 @@ def sqrtpx96_to_price(
         >>> sqrtpx96_to_price('1854219362252931989533640458424264', invert=True, decimal_adjustment=1e12)
         1825.732...  # 99.99999% accurate
     """
+    # Square in integers; the single int / int division below is correctly rounded
     sqrtpx96 = int(sqrtpx96)
-    p = sqrtpx96 / (2 ** 96)
+    sq = sqrtpx96 * sqrtpx96
 
     if invert:
-        return (1.0 / (p ** 2)) * decimal_adjustment
+        return Q192 / sq * decimal_adjustment
     else:
-        return (p ** 2) / decimal_adjustment
+        return sq / Q192 / decimal_adjustment
@@ -2,12 +2,21 @@
 Swap calculation functions for Uniswap V3.
 """
 
+from dataclasses import dataclass
 from typing import Any, Optional, TypedDict, Union
-from fractions import Fraction
+import numpy as np
 import pandas as pd
 
-from .tick import tick_to_price
-from .price import price_to_sqrtpx96, sqrtpx96_to_price
+from .tick import _closest_tick_int
+from .utils import TickIndex
+from .price import _decimal_adjustment, sqrtpx96_to_price
+from ._tick_lut import sqrtpx96_at_tick
+from ._sqrtpricemath import (
+    amount0_delta,
+    amount1_delta,
+    next_sqrt_price_from_amount0,
+    next_sqrt_price_from_amount1,
+)
 
 
 class SwapResult(TypedDict, total=False):
@@ -33,6 +42,59 @@ class TradeRecord(TypedDict, total=False):
     fee_tbl: pd.DataFrame
 
 
+@dataclass(frozen=True, slots=True)
+class _DirectionSpec:
+    """What differs between selling token 1 and selling token 0 in swap_across_ticks."""
+    price_up: bool
+    fee_col: str
+    in_field: str
+    out_field: str
+    in_key: str
+    fee_key: str
+    out_key: str
+
+
+# Selling dy pushes the price up (P = Y/X, more Y is more P),
+# selling dx pushes it down (more X is less P)
+_SELL_Y = _DirectionSpec(
+    price_up=True, fee_col="yfee", in_field="dy", out_field="dx",
+    in_key="dy_in", fee_key="dy_fee", out_key="dx_out"
+)
+_SELL_X = _DirectionSpec(
+    price_up=False, fee_col="xfee", in_field="dx", out_field="dy",
+    in_key="dx_in", fee_key="dx_fee", out_key="dy_out"
+)
+
+
+@dataclass(slots=True)
+class _FeeState:
+    """Per-position arrays carried across the hops of swap_across_ticks."""
+    liquidity: np.ndarray
+    active: np.ndarray
+    fees: np.ndarray
+
+
+def _liquidity_array(tbl: pd.DataFrame) -> np.ndarray:
+    """Liquidity column as an object array of Python ints, so big values stay exact."""
+    liquidity = tbl["liquidity"]
+    if pd.api.types.is_integer_dtype(liquidity):
+        return liquidity.to_numpy(dtype=object)
+    # Strings or floats from a CSV, or big ints already held as objects
+    return np.fromiter(map(int, liquidity), dtype=object, count=len(tbl))
+
+
+def _fee_shares(
+    liquidity: np.ndarray,
+    active: np.ndarray,
+    active_liquidity: int,
+    swap_fee: float
+) -> np.ndarray:
+    """Split a swap's fee across positions pro rata to their share of active_liquidity."""
+    if active_liquidity <= 0:
+        return np.zeros(len(liquidity))
+    return float(swap_fee) * np.where(active, liquidity, 0).astype(float) / active_liquidity
+
+
 def size_price_change_in_tick(
     l: Union[int, str],
     sqrtpx96: Union[int, str],
@@ -76,19 +138,16 @@ def size_price_change_in_tick(
     l = int(l)
     p = int(sqrtpx96)
     p_target = int(sqrtpx96_target)
-    c96 = 2 ** 96
+
+    # Gross up for the fee and scale to human units with one division
+    scale = (1 - fee) * decimal_scale
 
     if dx:
-        # Use Fraction for precise arithmetic
-        ip = Fraction(1, p)
-        ip_target = Fraction(1, p_target)
-        dxa = (ip_target - ip) * l
-        result = float(dxa) / (1 - fee) / decimal_scale * c96
-        return result
+        # dx = L * (1/P_target - 1/P), rounded to float once
+        return amount0_delta(p, p_target, l) / scale
     else:
-        dya = (p_target - p) * l
-        dy = dya / (1 - fee) / c96 / decimal_scale
-        return float(dy)
+        # dy = L * (P_target - P), rounded to float once
+        return amount1_delta(p, p_target, l) / scale
 
 
 def swap_within_tick(
@@ -147,10 +206,6 @@ def swap_within_tick(
 
     l = int(l)
     p = int(sqrtpx96)
-    c96 = 2 ** 96
-
-    # Use Fraction for precise arithmetic with inverse price
-    ip = Fraction(1, p)
 
     result: SwapResult = {
         "liquidity": l,
@@ -162,41 +217,34 @@ def swap_within_tick(
     }
 
     if dx is not None:
-        # Adjust real dx to 96 int & adjust for fees
-        dxa = Fraction(dx) * Fraction(int((1 - fee) * 1e18), int(1e18)) * Fraction(int(decimal_x)) / c96
+        # Amount after fees in raw token 0 units, held exactly as num / den
+        # (den is a power of 2) so sub-unit amounts are not rounded away
+        num, den = float(dx * (1 - fee) * decimal_x).as_integer_ratio()
 
         # iP_new = dx/L + iP
-        ip_new = dxa / l + ip
-        p_new = 1 / ip_new
-
-        # dy = (P_new - P) * L
-        dya = (p_new - p) * l
+        p_new = next_sqrt_price_from_amount0(p, l, num, den)
 
-        # Convert back to real units
-        dyz = float(dya / c96 / decimal_y)
+        # dy = (P_new - P) * L, converted back to real units
+        dyz = amount1_delta(p, p_new, l) / decimal_y
 
         result["dx"] = dx * (1 - fee)
         result["dy"] = dyz
-        result["price2"] = int(p_new)
+        result["price2"] = p_new
         result["fee"] = fee * dx
 
     elif dy is not None:
-        # Adjust real dy to 96 int & adjust for fees
-        dya = Fraction(dy) * Fraction(int((1 - fee) * 1e18), int(1e18)) * c96 * Fraction(int(decimal_y))
+        # Amount after fees in raw token 1 units, held exactly as num / den
+        num, den = float(dy * (1 - fee) * decimal_y).as_integer_ratio()
 
         # P_new = dy/L + P
-        p_new = dya / l + p
-        ip_new = 1 / p_new
-
-        # dx = (iP_new - iP) * L
-        dxa = (ip_new - ip) * l
+        p_new = next_sqrt_price_from_amount1(p, l, num, den)
 
-        # Convert to real units
-        dxz = float(dxa * c96 / decimal_x)
+        # dx = (iP_new - iP) * L, converted back to real units
+        dxz = amount0_delta(p, p_new, l) / decimal_x
 
         result["dx"] = dxz
         result["dy"] = dy * (1 - fee)
-        result["price2"] = int(p_new)
+        result["price2"] = p_new
         result["fee"] = fee * dy
 
     return result
@@ -231,6 +279,9 @@ def swap_across_ticks(
         decimal_y: The decimals used in token 1, e.g., 1e18 for WETH.
         fee: The pool fee, default 0.3% (0.003).
 
+    Ranges with no active liquidity are crossed without filling any of the trade.
+    Raises ValueError if the trade runs past the last position boundary.
+
     Returns:
         A TradeRecord dict containing:
         - ptbl: Updated liquidity positions table with active flags
@@ -251,12 +302,11 @@ def swap_across_ticks(
         >>> swp['dx_out']  # BTC removed from pool
         -84.98101962
     """
-    # Import here to avoid circular dependency
-    from .liquidity import check_positions
-    from .utils import find_recalculation_price
+    if "tick_lower" not in ptbl.columns or "tick_upper" not in ptbl.columns:
+        raise ValueError("Expected tick_lower and tick_upper columns")
 
     sqrtpx96 = int(sqrtpx96)
-    decimal_adjustment = max(decimal_y / decimal_x, decimal_x / decimal_y)
+    decimal_adjustment = _decimal_adjustment(decimal_x, decimal_y)
 
     if dx is None and dy is None:
         raise ValueError("A change in x or y is required to use liquidity")
@@ -264,261 +314,286 @@ def swap_across_ticks(
     if dx is not None and dy is not None:
         raise ValueError("Only 1 swap can be done at a time")
 
-    # Selling dy (price going up: P = Y/X, more Y is more P)
-    if dx is None:
-        amount = dy
-        price = sqrtpx96_to_price(sqrtpx96=sqrtpx96, invert=False, decimal_adjustment=decimal_adjustment)
-        update_ptbl = check_positions(ptbl, price, decimal_adjustment=decimal_adjustment, yx=True)
-
-        # Initialize or update fee table
-        if fee_tbl is None:
-            fee_tbl = update_ptbl[["tick_lower", "tick_upper", "liquidity", "active"]].copy()
-            fee_tbl["yfee"] = 0.0
-        else:
-            yfee = fee_tbl["yfee"].copy()
-            fee_tbl = update_ptbl[["tick_lower", "tick_upper", "liquidity", "active"]].copy()
-            fee_tbl["yfee"] = yfee
+    spec = _SELL_Y if dx is None else _SELL_X
+    amount = dy if dx is None else dx
 
-        recalc_price = find_recalculation_price(
-            ptbl=update_ptbl, p=price, price_up=True,
-            decimal_adjustment=decimal_adjustment, yx=True
+    # Totals carried over from an earlier part of the trade, if any
+    if trade_record is None:
+        amount_in = amount_fee = amount_out = 0.0
+    else:
+        amount_in = trade_record[spec.in_key]
+        amount_fee = trade_record[spec.fee_key]
+        amount_out = trade_record[spec.out_key]
+
+    # Positions are fixed for the whole trade, so their liquidity is read once and
+    # only the active flags and fees change from hop to hop
+    liquidity = _liquidity_array(ptbl)
+    if not pd.api.types.is_integer_dtype(ptbl["liquidity"]):
+        # Normalize string liquidity once so the returned tables hold real ints
+        ptbl = ptbl.assign(liquidity=liquidity)
+
+    state = _FeeState(
+        liquidity=liquidity,
+        active=np.zeros(len(ptbl), dtype=bool),
+        fees=(
+            np.zeros(len(ptbl)) if fee_tbl is None
+            else fee_tbl[spec.fee_col].to_numpy(dtype=float, copy=True)
         )
+    )
+    current_l = None
+
+    # Every tick where liquidity changes, sorted once. Each hop then finds the next
+    # one with a binary search instead of rescanning ptbl (as check_positions and
+    # find_recalculation_price would), and lands exactly on it
+    tick_lower = ptbl["tick_lower"].to_numpy()
+    tick_upper = ptbl["tick_upper"].to_numpy()
+    index = TickIndex(ptbl)
 
-        # Sum liquidity in active positions
-        current_l = sum(int(liq) for liq, active in zip(update_ptbl["liquidity"], update_ptbl["active"]) if active)
+    price = sqrtpx96_to_price(sqrtpx96=sqrtpx96, invert=False, decimal_adjustment=decimal_adjustment)
+    tick = _closest_tick_int(price, decimal_adjustment)
+
+    # Swap up to the next recalculation price, then carry the leftover into the next tick.
+    # sqrtpx96 is the exact state carried between hops
+    while True:
+        active = (tick_lower <= tick) & (tick_upper >= tick)
+
+        # Sum liquidity in active positions, only when the active set changed
+        if current_l is None or not np.array_equal(active, state.active):
+            state.active = active
+            current_l = int(state.liquidity[active].sum())
 
         # Maximum change without recalc
-        max_y = size_price_change_in_tick(
+        next_tick = index.next_above(tick) if spec.price_up else index.next_below(tick)
+        recalc_sqrtpx96 = sqrtpx96_at_tick(next_tick)
+
+        # A range without active liquidity absorbs nothing: the price crosses it
+        # for free, as in the pool contract
+        if current_l == 0:
+            if amount <= 0:
+                break
+            sqrtpx96 = recalc_sqrtpx96
+            tick = next_tick
+            continue
+
+        max_amount = size_price_change_in_tick(
             l=current_l,
             sqrtpx96=sqrtpx96,
-            sqrtpx96_target=price_to_sqrtpx96(recalc_price, invert=False, decimal_adjustment=decimal_adjustment),
-            dx=False,
-            decimal_scale=decimal_y,
+            sqrtpx96_target=recalc_sqrtpx96,
+            dx=not spec.price_up,
+            decimal_scale=decimal_y if spec.price_up else decimal_x,
             fee=fee
         )
 
-        # Can sell without recalculation
-        if max_y >= amount:
-            swap = swap_within_tick(
-                l=current_l,
-                sqrtpx96=price_to_sqrtpx96(p=price, invert=False, decimal_adjustment=decimal_adjustment),
-                dy=amount,
-                decimal_x=decimal_x,
-                decimal_y=decimal_y,
-                fee=fee
-            )
+        # Can sell the rest without recalculation, otherwise swap as much as possible
+        done = max_amount >= amount
+        step = amount if done else max_amount
 
-            # Attribute fees to positions
-            active_liquidity = sum(int(liq) for liq, active in zip(fee_tbl["liquidity"], fee_tbl["active"]) if active)
-            new_fees = [
-                float(swap["fee"]) * int(active) * int(liq) / active_liquidity if active_liquidity > 0 else 0.0
-                for liq, active in zip(fee_tbl["liquidity"], fee_tbl["active"])
-            ]
-
-            if trade_record is None:
-                fee_tbl["yfee"] = fee_tbl["yfee"] + new_fees
-                return TradeRecord(
-                    ptbl=update_ptbl,
-                    new_price=swap["price2"],
-                    dy_in=swap["dy"],
-                    dy_fee=swap["fee"],
-                    dx_out=swap["dx"],
-                    fee_tbl=fee_tbl
-                )
-            else:
-                tr = trade_record
-                fee_tbl["yfee"] = tr["fee_tbl"]["yfee"] + new_fees
-                return TradeRecord(
-                    ptbl=update_ptbl,
-                    new_price=swap["price2"],
-                    dy_in=tr["dy_in"] + swap["dy"],
-                    dy_fee=tr["dy_fee"] + swap["fee"],
-                    dx_out=tr["dx_out"] + swap["dx"],
-                    fee_tbl=fee_tbl
-                )
-
-        # Need to swap as much as possible and recurse
-        else:
-            leftover = amount - max_y
+        swap = swap_within_tick(
+            l=current_l,
+            sqrtpx96=sqrtpx96,
+            **{spec.in_field: step},
+            decimal_x=decimal_x,
+            decimal_y=decimal_y,
+            fee=fee
+        )
 
-            swap = swap_within_tick(
-                l=current_l,
-                sqrtpx96=price_to_sqrtpx96(p=price, invert=False, decimal_adjustment=decimal_adjustment),
-                dy=max_y,
-                decimal_x=decimal_x,
-                decimal_y=decimal_y,
-                fee=fee
-            )
+        # Attribute fees to positions
+        state.fees += _fee_shares(state.liquidity, state.active, current_l, swap["fee"])
 
-            # Attribute fees to positions
-            active_liquidity = sum(int(liq) for liq, active in zip(fee_tbl["liquidity"], fee_tbl["active"]) if active)
-            new_fees = [
-                float(swap["fee"]) * int(active) * int(liq) / active_liquidity if active_liquidity > 0 else 0.0
-                for liq, active in zip(fee_tbl["liquidity"], fee_tbl["active"])
-            ]
-
-            if trade_record is None:
-                fee_tbl["yfee"] = fee_tbl["yfee"] + new_fees
-                trade_record = TradeRecord(
-                    ptbl=update_ptbl,
-                    new_price=swap["price2"],
-                    dy_in=swap["dy"],
-                    dy_fee=swap["fee"],
-                    dx_out=swap["dx"],
-                    fee_tbl=fee_tbl
-                )
-            else:
-                tr = trade_record
-                fee_tbl["yfee"] = tr["fee_tbl"]["yfee"] + new_fees
-                trade_record = TradeRecord(
-                    ptbl=update_ptbl,
-                    new_price=swap["price2"],
-                    dy_in=tr["dy_in"] + swap["dy"],
-                    dy_fee=tr["dy_fee"] + swap["fee"],
-                    dx_out=tr["dx_out"] + swap["dx"],
-                    fee_tbl=fee_tbl
-                )
-
-            # Recurse with remaining amount
-            return swap_across_ticks(
-                ptbl=trade_record["ptbl"],
-                sqrtpx96=trade_record["new_price"],
-                fee_tbl=trade_record["fee_tbl"],
-                trade_record=trade_record,
-                dx=None,
-                dy=leftover,
-                decimal_x=decimal_x,
-                decimal_y=decimal_y,
-                fee=fee
-            )
+        amount_in += swap[spec.in_field]
+        amount_fee += swap["fee"]
+        amount_out += swap[spec.out_field]
 
-    # Selling dx (price going down: P = Y/X, more X is less P)
-    elif dy is None:
-        amount = dx
-        price = sqrtpx96_to_price(sqrtpx96=sqrtpx96, invert=False, decimal_adjustment=decimal_adjustment)
-        update_ptbl = check_positions(ptbl, price, decimal_adjustment=decimal_adjustment, yx=True)
+        if done:
+            sqrtpx96 = swap["price2"]
+            break
 
-        # Initialize or update fee table
-        if fee_tbl is None:
-            fee_tbl = update_ptbl[["tick_lower", "tick_upper", "liquidity", "active"]].copy()
-            fee_tbl["xfee"] = 0.0
-        else:
-            xfee = fee_tbl["xfee"].copy()
-            fee_tbl = update_ptbl[["tick_lower", "tick_upper", "liquidity", "active"]].copy()
-            fee_tbl["xfee"] = xfee
+        # max_amount was sized to land exactly on the boundary, so start the next
+        # hop there rather than on the rounded result of the swap
+        sqrtpx96 = recalc_sqrtpx96
+        tick = next_tick
+        amount -= max_amount
 
-        recalc_price = find_recalculation_price(
-            ptbl=update_ptbl, p=price, price_up=False,
-            decimal_adjustment=decimal_adjustment, yx=True
-        )
+    update_ptbl = ptbl.assign(active=state.active)
+    fee_tbl = update_ptbl[["tick_lower", "tick_upper", "liquidity", "active"]].copy()
+    fee_tbl[spec.fee_col] = state.fees
 
-        # Sum liquidity in active positions
-        current_l = sum(int(liq) for liq, active in zip(update_ptbl["liquidity"], update_ptbl["active"]) if active)
+    return TradeRecord(
+        ptbl=update_ptbl,
+        new_price=sqrtpx96,
+        **{spec.in_key: amount_in, spec.fee_key: amount_fee, spec.out_key: amount_out},
+        fee_tbl=fee_tbl
+    )
 
-        # Maximum change without recalc
-        max_x = size_price_change_in_tick(
+
+def swap_across_ticks_batch(
+    ptbl: pd.DataFrame,
+    sqrtpx96: Union[int, str],
+    dx: Optional[Union[float, np.ndarray]] = None,
+    dy: Optional[Union[float, np.ndarray]] = None,
+    decimal_x: float = 1e18,
+    decimal_y: float = 1e18,
+    fee: float = 0.003
+) -> pd.DataFrame:
+    """
+    Quote many candidate trade sizes against the same pool state at once.
+
+    Equivalent to calling swap_across_ticks once per amount, but the tick ladder
+    is walked a single time, recording the cumulative amounts at each boundary.
+    Each candidate then only needs a binary search for the tick range it ends in
+    and one swap_within_tick for the remainder. Useful for sizing sweeps, e.g.,
+    finding the largest buy that stays under a price impact limit.
+
+    Args:
+        ptbl: Liquidity positions table with columns tick_lower, tick_upper, liquidity.
+        sqrtpx96: Current price in Uniswap 64.96 square root price format.
+        dx: Human readable amounts of token 0 to trade, scalar or 1D array. None if
+            trading token 1.
+        dy: Human readable amounts of token 1 to trade, scalar or 1D array. None if
+            trading token 0.
+        decimal_x: The decimals used in token 0, e.g., 1e6 for USDC, 1e8 for WBTC.
+        decimal_y: The decimals used in token 1, e.g., 1e18 for WETH.
+        fee: The pool fee, default 0.3% (0.003).
+
+    Returns:
+        A DataFrame with one row per candidate amount and the same totals
+        swap_across_ticks reports: amount, then dy_in, dy_fee, dx_out (or dx_in,
+        dx_fee, dy_out), and new_price. Ranges with no active liquidity are
+        crossed without filling, as in swap_across_ticks. Amounts beyond the last
+        position boundary cannot be filled and get NaN (new_price None) where
+        swap_across_ticks would raise.
+
+    Examples:
+        >>> quotes = swap_across_ticks_batch(
+        ...     ptbl=liquidity_table, sqrtpx96=sqrtpx96,
+        ...     dy=[100.0, 500.0, 1140.0],
+        ...     decimal_x=1e8, decimal_y=1e18, fee=0.003
+        ... )
+        >>> quotes['dx_out']  # BTC removed from pool per candidate
+    """
+    if "tick_lower" not in ptbl.columns or "tick_upper" not in ptbl.columns:
+        raise ValueError("Expected tick_lower and tick_upper columns")
+
+    if dx is None and dy is None:
+        raise ValueError("A change in x or y is required to use liquidity")
+
+    if dx is not None and dy is not None:
+        raise ValueError("Only 1 swap can be done at a time")
+
+    spec = _SELL_Y if dx is None else _SELL_X
+    amounts = np.atleast_1d(np.asarray(dy if dx is None else dx, dtype=np.float64))
+    sqrtpx96 = int(sqrtpx96)
+    decimal_adjustment = _decimal_adjustment(decimal_x, decimal_y)
+    decimal_scale = decimal_y if spec.price_up else decimal_x
+
+    liquidity = _liquidity_array(ptbl)
+    tick_lower = ptbl["tick_lower"].to_numpy()
+    tick_upper = ptbl["tick_upper"].to_numpy()
+    index = TickIndex(ptbl)
+
+    price = sqrtpx96_to_price(sqrtpx96=sqrtpx96, invert=False, decimal_adjustment=decimal_adjustment)
+    tick = _closest_tick_int(price, decimal_adjustment)
+
+    # Walk the ladder once, recording for each tick range its start price, its
+    # liquidity, and the totals swapped before reaching it
+    seg_sqrtpx96 = []
+    seg_l = []
+    seg_start = [0.0]
+    seg_in = [0.0]
+    seg_fee = [0.0]
+    seg_out = [0.0]
+    largest = amounts.max(initial=0.0)
+
+    while True:
+        active = (tick_lower <= tick) & (tick_upper >= tick)
+        current_l = int(liquidity[active].sum())
+        seg_sqrtpx96.append(sqrtpx96)
+        seg_l.append(current_l)
+
+        try:
+            next_tick = index.next_above(tick) if spec.price_up else index.next_below(tick)
+        except ValueError:
+            # Out of positions: amounts past the last recorded range can't be filled
+            seg_start.append(np.inf)
+            break
+
+        recalc_sqrtpx96 = sqrtpx96_at_tick(next_tick)
+        max_amount = size_price_change_in_tick(
             l=current_l,
             sqrtpx96=sqrtpx96,
-            sqrtpx96_target=price_to_sqrtpx96(recalc_price, invert=False, decimal_adjustment=decimal_adjustment),
-            dx=True,
-            decimal_scale=decimal_x,
+            sqrtpx96_target=recalc_sqrtpx96,
+            dx=not spec.price_up,
+            decimal_scale=decimal_scale,
             fee=fee
         )
 
-        # Can sell without recalculation
-        if max_x >= amount:
+        if max_amount > 0:
             swap = swap_within_tick(
                 l=current_l,
-                sqrtpx96=price_to_sqrtpx96(p=price, invert=False, decimal_adjustment=decimal_adjustment),
-                dx=amount,
+                sqrtpx96=sqrtpx96,
+                **{spec.in_field: max_amount},
                 decimal_x=decimal_x,
                 decimal_y=decimal_y,
                 fee=fee
             )
-
-            # Attribute fees to positions
-            active_liquidity = sum(int(liq) for liq, active in zip(fee_tbl["liquidity"], fee_tbl["active"]) if active)
-            new_fees = [
-                float(swap["fee"]) * int(active) * int(liq) / active_liquidity if active_liquidity > 0 else 0.0
-                for liq, active in zip(fee_tbl["liquidity"], fee_tbl["active"])
-            ]
-
-            if trade_record is None:
-                fee_tbl["xfee"] = fee_tbl["xfee"] + new_fees
-                return TradeRecord(
-                    ptbl=update_ptbl,
-                    new_price=swap["price2"],
-                    dx_in=swap["dx"],
-                    dx_fee=swap["fee"],
-                    dy_out=swap["dy"],
-                    fee_tbl=fee_tbl
-                )
-            else:
-                tr = trade_record
-                fee_tbl["xfee"] = tr["fee_tbl"]["xfee"] + new_fees
-                return TradeRecord(
-                    ptbl=update_ptbl,
-                    new_price=swap["price2"],
-                    dx_in=tr["dx_in"] + swap["dx"],
-                    dx_fee=tr["dx_fee"] + swap["fee"],
-                    dy_out=tr["dy_out"] + swap["dy"],
-                    fee_tbl=fee_tbl
-                )
-
-        # Need to swap as much as possible and recurse
+            seg_in.append(seg_in[-1] + swap[spec.in_field])
+            seg_fee.append(seg_fee[-1] + swap["fee"])
+            seg_out.append(seg_out[-1] + swap[spec.out_field])
         else:
-            leftover = amount - max_x
-
-            swap = swap_within_tick(
-                l=current_l,
-                sqrtpx96=price_to_sqrtpx96(p=price, invert=False, decimal_adjustment=decimal_adjustment),
-                dx=max_x,
-                decimal_x=decimal_x,
-                decimal_y=decimal_y,
-                fee=fee
-            )
-
-            # Attribute fees to positions
-            active_liquidity = sum(int(liq) for liq, active in zip(fee_tbl["liquidity"], fee_tbl["active"]) if active)
-            new_fees = [
-                float(swap["fee"]) * int(active) * int(liq) / active_liquidity if active_liquidity > 0 else 0.0
-                for liq, active in zip(fee_tbl["liquidity"], fee_tbl["active"])
-            ]
-
-            if trade_record is None:
-                fee_tbl["xfee"] = fee_tbl["xfee"] + new_fees
-                trade_record = TradeRecord(
-                    ptbl=update_ptbl,
-                    new_price=swap["price2"],
-                    dx_in=swap["dx"],
-                    dx_fee=swap["fee"],
-                    dy_out=swap["dy"],
-                    fee_tbl=fee_tbl
-                )
-            else:
-                tr = trade_record
-                fee_tbl["xfee"] = tr["fee_tbl"]["xfee"] + new_fees
-                trade_record = TradeRecord(
-                    ptbl=update_ptbl,
-                    new_price=swap["price2"],
-                    dx_in=tr["dx_in"] + swap["dx"],
-                    dx_fee=tr["dx_fee"] + swap["fee"],
-                    dy_out=tr["dy_out"] + swap["dy"],
-                    fee_tbl=fee_tbl
-                )
-
-            # Recurse with remaining amount
-            return swap_across_ticks(
-                ptbl=trade_record["ptbl"],
-                sqrtpx96=trade_record["new_price"],
-                fee_tbl=trade_record["fee_tbl"],
-                trade_record=trade_record,
-                dx=leftover,
-                dy=None,
-                decimal_x=decimal_x,
-                decimal_y=decimal_y,
-                fee=fee
-            )
-
-    # Should never reach here
-    raise ValueError("Invalid state")
+            seg_in.append(seg_in[-1])
+            seg_fee.append(seg_fee[-1])
+            seg_out.append(seg_out[-1])
+        seg_start.append(seg_start[-1] + max_amount)
+
+        if seg_start[-1] >= largest:
+            break
+
+        sqrtpx96 = recalc_sqrtpx96
+        tick = next_tick
+
+    # Range k covers amounts in (seg_start[k], seg_start[k + 1]]. If the walk ran
+    # out of positions, the last range ends at inf and marks unfillable amounts
+    ends = np.asarray(seg_start[1:])
+    seg = np.searchsorted(ends, amounts, side="left")
+
+    n = len(amounts)
+    amount_in = np.full(n, np.nan)
+    amount_fee = np.full(n, np.nan)
+    amount_out = np.full(n, np.nan)
+    new_price = np.full(n, None, dtype=object)
+
+    for j in range(n):
+        k = seg[j]
+        if not np.isfinite(ends[k]):
+            continue
+
+        # Only a zero-size trade can end in a range without liquidity (such a
+        # range is crossed without filling); it stops at the range's start
+        if seg_l[k] == 0:
+            amount_in[j] = seg_in[k]
+            amount_fee[j] = seg_fee[k]
+            amount_out[j] = seg_out[k]
+            new_price[j] = seg_sqrtpx96[k]
+            continue
+
+        remaining = amounts[j] - seg_start[k]
+        swap = swap_within_tick(
+            l=seg_l[k],
+            sqrtpx96=seg_sqrtpx96[k],
+            **{spec.in_field: float(remaining)},
+            decimal_x=decimal_x,
+            decimal_y=decimal_y,
+            fee=fee
+        )
+        amount_in[j] = seg_in[k] + swap[spec.in_field]
+        amount_fee[j] = seg_fee[k] + swap["fee"]
+        amount_out[j] = seg_out[k] + swap[spec.out_field]
+        new_price[j] = swap["price2"]
+
+    return pd.DataFrame({
+        "amount": amounts,
+        spec.in_key: amount_in,
+        spec.fee_key: amount_fee,
+        spec.out_key: amount_out,
+        "new_price": new_price,
+    })
@@ -4,6 +4,10 @@ Tick-related conversion functions for Uniswap V3.
 
 import math
 from typing import TypedDict
+import numpy as np
+
+# Ticks are powers of 1.0001: price = 1.0001^tick, tick = log(price) / log(1.0001)
+_LOG_10001 = math.log(1.0001)
 
 
 class ClosestTickResult(TypedDict):
@@ -40,7 +44,7 @@ def tick_to_price(tick: int, decimal_adjustment: float = 1.0, yx: bool = True) -
         >>> tick_to_price(260220, decimal_adjustment=1e10, yx=True)
         19.98232...
     """
-    p = math.sqrt(1.0001) ** (2 * tick)
+    p = 1.0001 ** tick
 
     if yx:
         p = p / decimal_adjustment
@@ -50,6 +54,37 @@ def tick_to_price(tick: int, decimal_adjustment: float = 1.0, yx: bool = True) -
     return p
 
 
+def tick_to_price_batch(
+    ticks: np.ndarray,
+    decimal_adjustment: float = 1.0,
+    yx: bool = True
+) -> np.ndarray:
+    """
+    Convert many Uniswap V3 ticks to human readable prices at once.
+
+    Vectorized form of tick_to_price for whole columns of ticks, e.g., every
+    tick_lower and tick_upper in a positions table.
+
+    Args:
+        ticks: The numeric ticks, as a 1D array, list, or pandas Series.
+        decimal_adjustment: The difference in the tokens decimals, e.g., 1e10 for ETH vs BTC,
+            1e12 for USDC vs ETH.
+        yx: Whether to return prices in Token 1 / Token 0 format or inverted. Default True.
+
+    Returns:
+        A float64 array of prices in desired format, one per tick.
+
+    Examples:
+        >>> tick_to_price_batch([256400, 260220], decimal_adjustment=1e10, yx=True)
+        array([13.638..., 19.98232...])
+    """
+    p = np.power(1.0001, np.asarray(ticks, dtype=np.float64))
+
+    if yx:
+        return p / decimal_adjustment
+    return decimal_adjustment / p
+
+
 def get_closest_tick(
     desired_price: float,
     tick_spacing: int = 60,
@@ -88,30 +123,28 @@ def get_closest_tick(
         {'desired_price': 20, 'actual_price': ..., 'tick': 260220}
     """
     # If price is NOT Y/X formatted already, invert for tick calculation,
-    # then invert prices for human readability. Results in same exact tick.
-    if not yx:
-        result = get_closest_tick(
-            desired_price=1.0 / desired_price,
-            tick_spacing=tick_spacing,
-            decimal_adjustment=decimal_adjustment,
-            yx=True
-        )
-        result["desired_price"] = 1.0 / result["desired_price"]
-        result["actual_price"] = 1.0 / result["actual_price"]
-        return result
-
-    initial_tick = math.log(math.sqrt(desired_price * decimal_adjustment)) / math.log(math.sqrt(1.0001))
+    # then invert the result back for human readability. Results in same exact tick.
+    p = desired_price if yx else 1.0 / desired_price
+
+    initial_tick = math.log(p * decimal_adjustment) / _LOG_10001
 
     if initial_tick % tick_spacing == 0:
         actual_price = desired_price
         tick = int(initial_tick)
     else:
-        final_tick = round(initial_tick / tick_spacing) * tick_spacing
-        tick = final_tick
-        actual_price = (math.sqrt(1.0001) ** (2 * final_tick)) / decimal_adjustment
+        tick = round(initial_tick / tick_spacing) * tick_spacing
+        actual_price = (1.0001 ** tick) / decimal_adjustment
+        if not yx:
+            actual_price = 1.0 / actual_price
 
     return ClosestTickResult(
         desired_price=desired_price,
         actual_price=actual_price,
         tick=tick
     )
+
+
+def _closest_tick_int(p: float, decimal_adjustment: float = 1.0) -> int:
+    """get_closest_tick(p, tick_spacing=1, decimal_adjustment)['tick'] for a Y/X price, without the dict."""
+    # Divide (not multiply by 1 / log) so the rounding matches get_closest_tick exactly
+    return round(math.log(p * decimal_adjustment) / _LOG_10001)